@@ -11,35 +11,108 @@ from __future__ import annotations
 __version__ = "1.1.0"
 
 import argparse
+import asyncio
 import contextlib
+import fcntl
+import functools
 import json
 import os
+import select
+import shlex
+import shutil
 import signal
-import socket
 import subprocess
 import sys
+import threading
 import time
-from dataclasses import dataclass
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+try:  # optional: faster config parsing/serialization
+    import orjson
+except ImportError:
+    orjson = None
+
+# dataclass(slots=True) needs Python 3.10+; older versions keep __dict__.
+DATACLASS_SLOTS: Dict[str, Any] = {"slots": True} if sys.version_info >= (3, 10) else {}
 
 CONFIG_PATH = Path.home() / ".config" / "git-sync" / "config.json"
 DEFAULT_LOCK_PATH = Path.home() / ".config" / "git-sync" / "lock"
+# Per-entry record of the last pass that confirmed the remote was in sync.
+STATE_PATH = Path.home() / ".config" / "git-sync" / "state.json"
 DEFAULT_INTERVAL_MINUTES = 5
 DEFAULT_NETWORK_HOST = "github.com"
 DEFAULT_NETWORK_PORT = 22
+# A clean entry whose HEAD hasn't moved since the remote last matched it
+# skips the pull/push until this much time has passed.
+DEFAULT_REMOTE_RECHECK_MINUTES = 60
 MIN_INTERVAL_MINUTES = 1
 DEFAULT_GIT_TIMEOUT_SECONDS = 30
-
-
-@dataclass
+# Bytes of `git status --branch` output read: all headers plus a first entry.
+STATUS_HEADER_LIMIT = 4096
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+# Entries synced concurrently unless --jobs says otherwise.
+DEFAULT_JOBS = min(8, os.cpu_count() or 1)
+# Reachability probes: connect timeout, and how long an answer (from a
+# probe or a failed pull) is reused before the host is probed again.
+PROBE_TIMEOUT_SECONDS = 2
+REACHABILITY_TTL_SECONDS = 60
+
+# Resolved once so spawns don't repeat the PATH search.
+GIT_BIN = shutil.which("git") or "git"
+
+# Built once and shared by every git spawn. The inherited environment is
+# kept (ssh-agent, proxies); LC_ALL=C skips gettext and keeps stderr in
+# the English wording matched below. HTTP(S) transfers that stall abort
+# instead of waiting for the full timeout.
+GIT_ENV = dict(os.environ)
+GIT_ENV["LC_ALL"] = "C"
+GIT_ENV.setdefault("GIT_HTTP_LOW_SPEED_LIMIT", "1000")
+GIT_ENV.setdefault("GIT_HTTP_LOW_SPEED_TIME", "3")
+
+# stderr fragments (ssh, curl, git) that mean the remote host is unreachable.
+NETWORK_ERROR_MARKERS = (
+    "Could not resolve host",
+    "Temporary failure in name resolution",
+    "Connection timed out",
+    "Connection refused",
+    "Network is unreachable",
+    "No route to host",
+    "Failed to connect",
+    "Operation too slow",
+)
+# Exit status used by the commit chain when the index has nothing staged.
+NOTHING_TO_COMMIT_EXIT = 3
+
+
+def json_loads(raw: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def json_dumps(data: Any) -> bytes:
+    """Encode `data` as indented JSON (2 spaces), matching the on-disk format."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode("utf-8")
+
+
+@dataclass(**DATACLASS_SLOTS)
 class Entry:
     path: Path
     remote: Optional[str]
     branch: str
     push: bool
     commit_message: str
+    untracked: bool = True
+    # Cached "<path>/.git" so repo_exists doesn't build a Path on every pass.
+    _git_dir: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._git_dir = os.path.join(str(self.path), ".git")
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "Entry":
@@ -49,6 +122,7 @@ class Entry:
             branch=data.get("branch", "main"),
             push=bool(data.get("push", True)),
             commit_message=data.get("commit_message", "Auto-sync"),
+            untracked=bool(data.get("untracked", True)),
         )
 
     def to_dict(self) -> Dict[str, Any]:
@@ -58,22 +132,29 @@ class Entry:
             "branch": self.branch,
             "push": self.push,
             "commit_message": self.commit_message,
+            "untracked": self.untracked,
         }
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class Config:
-    entries: List[Entry]
+    # str(path) -> Entry, in the order entries were added.
+    entries: Dict[str, Entry]
     interval_minutes: int
     network_host: str
     network_port: int
+    remote_recheck_minutes: int = DEFAULT_REMOTE_RECHECK_MINUTES
+    # Bytes last read from or written to CONFIG_PATH; save() skips
+    # rewriting an identical file.
+    _raw: bytes = field(default=b"", repr=False, compare=False)
 
     @classmethod
     def load(cls) -> "Config":
-        if not CONFIG_PATH.exists():
-            CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            raw = CONFIG_PATH.read_bytes()
+        except FileNotFoundError:
             cfg = cls(
-                entries=[],
+                entries={},
                 interval_minutes=DEFAULT_INTERVAL_MINUTES,
                 network_host=DEFAULT_NETWORK_HOST,
                 network_port=DEFAULT_NETWORK_PORT,
@@ -81,92 +162,386 @@ class Config:
             cfg.save()
             return cfg
 
-        with CONFIG_PATH.open("r", encoding="utf-8") as fh:
-            data = json.load(fh)
+        data = json_loads(raw)
 
-        entries = [Entry.from_dict(item) for item in data.get("entries", [])]
+        entries: Dict[str, Entry] = {}
+        for item in data.get("entries", []):
+            entry = Entry.from_dict(item)
+            entries[str(entry.path)] = entry
         interval = max(
             MIN_INTERVAL_MINUTES, int(data.get("interval_minutes", DEFAULT_INTERVAL_MINUTES))
         )
         host = data.get("network_host", DEFAULT_NETWORK_HOST)
         port = int(data.get("network_port", DEFAULT_NETWORK_PORT))
-        return cls(entries=entries, interval_minutes=interval, network_host=host, network_port=port)
+        recheck = max(
+            0, int(data.get("remote_recheck_minutes", DEFAULT_REMOTE_RECHECK_MINUTES))
+        )
+        return cls(
+            entries=entries,
+            interval_minutes=interval,
+            network_host=host,
+            network_port=port,
+            remote_recheck_minutes=recheck,
+            _raw=raw,
+        )
 
     def save(self) -> None:
-        CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
+        ensure_dir(CONFIG_PATH.parent)
         data = {
-            "entries": [e.to_dict() for e in self.entries],
+            "entries": [e.to_dict() for e in self.entries.values()],
             "interval_minutes": self.interval_minutes,
             "network_host": self.network_host,
             "network_port": self.network_port,
+            "remote_recheck_minutes": self.remote_recheck_minutes,
         }
-        with CONFIG_PATH.open("w", encoding="utf-8") as fh:
-            json.dump(data, fh, indent=2)
+        raw = json_dumps(data)
+        if raw == self._raw:
+            return
+        # One write of the encoded buffer, then an atomic rename over the old file.
+        tmp = CONFIG_PATH.with_suffix(".json.tmp")
+        tmp.write_bytes(raw)
+        os.replace(tmp, CONFIG_PATH)
+        self._raw = raw
+
+
+# Directories this process has already created or found; a daemon writes
+# the config, state and pid files into the same few every pass.
+_known_dirs: Set[Path] = set()
+
+
+def ensure_dir(path: Path) -> None:
+    if path in _known_dirs:
+        return
+    path.mkdir(parents=True, exist_ok=True)
+    _known_dirs.add(path)
+
+
+# (mtime_ns, size) of CONFIG_PATH when it was last parsed, and the result.
+_cfg_cache: Optional[Tuple[Tuple[int, int], Config]] = None
+
+
+def load_config_cached() -> Config:
+    """Return the config, re-parsing it only when the file has changed."""
+    global _cfg_cache
+    try:
+        st = CONFIG_PATH.stat()
+    except FileNotFoundError:
+        st = None
+    if st is not None and _cfg_cache is not None:
+        key, cfg = _cfg_cache
+        if key == (st.st_mtime_ns, st.st_size):
+            return cfg
+    cfg = Config.load()
+    if st is None:
+        # load() just created the file with defaults.
+        st = CONFIG_PATH.stat()
+    # Keyed on the stat taken before the read, so an edit landing while
+    # the file is parsed still looks changed on the next call.
+    _cfg_cache = ((st.st_mtime_ns, st.st_size), cfg)
+    return cfg
 
 
 # --------------------------- helpers ---------------------------
 
 
+_log_lock = threading.Lock()
+# (epoch second, formatted timestamp) of the last log line; a pass logs
+# many lines within the same second.
+_log_ts: Tuple[int, str] = (-1, "")
+
+
 def log(msg: str) -> None:
-    ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"[{ts}] {msg}", flush=True)
+    global _log_ts
+    now = int(time.time())
+    # Entries sync on worker threads; keep their lines from interleaving.
+    with _log_lock:
+        if _log_ts[0] != now:
+            _log_ts = (now, time.strftime(TIMESTAMP_FORMAT, time.localtime(now)))
+        print(f"[{_log_ts[1]}] {msg}", flush=True)
 
 
 def run_git(
     path: Path,
     *args: str,
-    check: bool = True,
+    check: bool = False,
+    capture: bool = True,
     timeout_seconds: int = DEFAULT_GIT_TIMEOUT_SECONDS,
 ) -> subprocess.CompletedProcess[str]:
+    """Run git in `path`. With `capture=False` stdout is discarded and only
+    stderr is kept for error messages."""
+    # Protocol v2 lets fetches ask only for the refs they need.
     return subprocess.run(
-        ["git", "-C", str(path), *args],
+        [GIT_BIN, "-C", str(path), "-c", "protocol.version=2", *args],
         check=check,
         text=True,
-        capture_output=True,
+        stdout=subprocess.PIPE if capture else subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
         timeout=timeout_seconds,
+        env=GIT_ENV,
     )
 
 
-@contextlib.contextmanager
-def pid_lock(lock_path: Path) -> "contextlib.AbstractContextManager[None]":
-    lock_path.parent.mkdir(parents=True, exist_ok=True)
+def fast_git(
+    path: Path,
+    *args: str,
+    limit: int,
+    timeout_seconds: int = DEFAULT_GIT_TIMEOUT_SECONDS,
+) -> Tuple[int, str]:
+    """Run a quick read-only git query via os.posix_spawn.
+
+    Used for the small queries made on every pass; it skips the pipe and
+    thread bookkeeping of subprocess.run. stderr is discarded. At most
+    `limit` bytes are read and git is stopped early instead of buffering
+    the rest. Raises subprocess.TimeoutExpired, like run_git, if
+    git takes longer than `timeout_seconds`. Returns (returncode, stdout).
+    """
+    if not hasattr(os, "posix_spawnp"):
+        res = run_git(path, *args, timeout_seconds=timeout_seconds)
+        return (res.returncode, res.stdout[:limit])
+    cmd = ["git", "-C", str(path), *args]
+    deadline = time.monotonic() + timeout_seconds
+    read_fd, write_fd = os.pipe()
+    try:
+        pid = os.posix_spawnp(
+            GIT_BIN,
+            cmd,
+            GIT_ENV,
+            file_actions=[
+                (os.POSIX_SPAWN_DUP2, write_fd, 1),
+                (os.POSIX_SPAWN_OPEN, 2, os.devnull, os.O_WRONLY, 0),
+            ],
+        )
+    except OSError:
+        os.close(read_fd)
+        raise
+    finally:
+        os.close(write_fd)
+    chunks: List[bytes] = []
+    size = 0
+    poller = select.poll()
+    poller.register(read_fd, select.POLLIN)
     try:
-        fd = os.open(str(lock_path), os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
-    except FileExistsError:
+        while size < limit:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not poller.poll(remaining * 1000):
+                _kill_and_reap(pid)
+                raise subprocess.TimeoutExpired(cmd, timeout_seconds)
+            chunk = os.read(read_fd, limit - size)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            size += len(chunk)
+    finally:
+        os.close(read_fd)
+    if size >= limit:
+        with contextlib.suppress(ProcessLookupError):
+            os.kill(pid, signal.SIGTERM)
+    code = _wait_pid(pid, deadline, cmd, timeout_seconds)
+    return (code, b"".join(chunks).decode("utf-8", errors="replace"))
+
+
+def git_status_code(
+    path: Path, *args: str, timeout_seconds: int = DEFAULT_GIT_TIMEOUT_SECONDS
+) -> int:
+    """Run a git query whose answer is its exit status; output goes to /dev/null."""
+    if not hasattr(os, "posix_spawnp"):
+        return subprocess.run(
+            [GIT_BIN, "-C", str(path), *args],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            timeout=timeout_seconds,
+            env=GIT_ENV,
+        ).returncode
+    cmd = ["git", "-C", str(path), *args]
+    deadline = time.monotonic() + timeout_seconds
+    pid = os.posix_spawnp(
+        GIT_BIN,
+        cmd,
+        GIT_ENV,
+        file_actions=[
+            (os.POSIX_SPAWN_OPEN, 1, os.devnull, os.O_WRONLY, 0),
+            (os.POSIX_SPAWN_DUP2, 1, 2),
+        ],
+    )
+    return _wait_pid(pid, deadline, cmd, timeout_seconds)
+
+
+def _wait_pid(pid: int, deadline: float, cmd: List[str], timeout_seconds: int) -> int:
+    """Reap `pid` and return its exit code, killing it if `deadline` passes.
+
+    Polls with a growing sleep, as subprocess.Popen.wait(timeout) does.
+    """
+    delay = 0.0005
+    while True:
+        done, status = os.waitpid(pid, os.WNOHANG)
+        if done:
+            return os.WEXITSTATUS(status) if os.WIFEXITED(status) else -1
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            _kill_and_reap(pid)
+            raise subprocess.TimeoutExpired(cmd, timeout_seconds)
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, 0.05)
+
+
+def _kill_and_reap(pid: int) -> None:
+    with contextlib.suppress(ProcessLookupError):
+        os.kill(pid, signal.SIGKILL)
+    os.waitpid(pid, 0)
+
+
+def run_shell(
+    script: str,
+    timeout_seconds: int = DEFAULT_GIT_TIMEOUT_SECONDS,
+) -> subprocess.CompletedProcess[str]:
+    """Run a short POSIX shell script so chained git calls share one spawn."""
+    return subprocess.run(
+        ["sh", "-c", script],
+        check=False,
+        text=True,
+        capture_output=True,
+        timeout=timeout_seconds,
+        env=GIT_ENV,
+    )
+
+
+class GitSession:
+    """Long-running `git cat-file --batch-check` process for ref lookups.
+
+    Each lookup is a line written to stdin and a line read back, so repeated
+    queries against the same repo avoid a fresh git spawn. Refs are re-read
+    by git on every query, so answers stay current across fetches. The
+    process is restarted if the repo's `.git` is replaced (deleted and
+    re-cloned or re-initialized), since it keeps reading the old one.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._git_dir = os.path.join(str(path), ".git")
+        self._proc: Optional[subprocess.Popen[str]] = None
+        # (st_dev, st_ino) of `.git` when the process was started.
+        self._identity: Optional[Tuple[int, int]] = None
+
+    def _current_identity(self) -> Optional[Tuple[int, int]]:
         try:
-            stale_pid = int(lock_path.read_text(encoding="utf-8").strip())
-        except Exception:
-            stale_pid = None
+            st = os.stat(self._git_dir)
+        except OSError:
+            return None
+        return (st.st_dev, st.st_ino)
+
+    def _ensure_proc(self) -> subprocess.Popen[str]:
+        identity = self._current_identity()
+        if self._proc is not None and (identity is None or identity != self._identity):
+            self.close()
+        if self._proc is None or self._proc.poll() is not None:
+            self._identity = identity
+            self._proc = subprocess.Popen(
+                [GIT_BIN, "-C", str(self.path), "cat-file", "--batch-check=%(objectname)"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                bufsize=1,
+                env=GIT_ENV,
+            )
+        return self._proc
+
+    def resolve(self, rev: str) -> Optional[str]:
+        """Return the object name `rev` points at, or None if it doesn't resolve."""
+        proc = self._ensure_proc()
+        try:
+            proc.stdin.write(f"{rev}\n")
+            proc.stdin.flush()
+            line = proc.stdout.readline().strip()
+        except OSError:
+            self.close()
+            return None
+        # Unknown revs come back as "<rev> missing" / "<rev> ambiguous".
+        if not line or " " in line:
+            return None
+        return line
+
+    def close(self) -> None:
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        with contextlib.suppress(OSError):
+            proc.stdin.close()
+        try:
+            proc.wait(timeout=DEFAULT_GIT_TIMEOUT_SECONDS)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+
+# Sessions stay open across run_loop iterations, keyed by repo path.
+_sessions: Dict[Path, GitSession] = {}
 
-        if stale_pid is not None:
-            try:
-                os.kill(stale_pid, 0)
-                raise SystemExit(f"Another git-sync instance is running (pid {stale_pid}).")
-            except ProcessLookupError:
-                # Stale lock; remove and retry once
-                with contextlib.suppress(OSError):
-                    lock_path.unlink()
-                fd = os.open(str(lock_path), os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
-            except PermissionError:
-                raise SystemExit(
-                    f"Lockfile exists and pid {stale_pid} is not accessible; aborting."
-                )
-        else:
-            raise SystemExit(f"Lockfile exists at {lock_path}; aborting.")
 
+def git_session(path: Path) -> GitSession:
+    session = _sessions.get(path)
+    if session is None:
+        session = _sessions[path] = GitSession(path)
+    return session
+
+
+def prune_sessions(keep: List[Path]) -> None:
+    """Close sessions for repos that are no longer tracked."""
+    wanted = set(keep)
+    for path in [p for p in _sessions if p not in wanted]:
+        _sessions.pop(path).close()
+
+
+def close_sessions() -> None:
+    for session in _sessions.values():
+        session.close()
+    _sessions.clear()
+
+
+@contextlib.contextmanager
+def pid_lock(lock_path: Path) -> "contextlib.AbstractContextManager[int]":
+    """Hold an exclusive flock on `lock_path`; yields the locked fd.
+
+    The kernel drops a flock when the last descriptor closes, even on
+    SIGKILL, so there is no stale lock to detect. The file is left in
+    place: unlinking it would let a second process lock a fresh inode
+    while the first still holds the old one.
+    """
+    ensure_dir(lock_path.parent)
+    fd = os.open(str(lock_path), os.O_CREAT | os.O_RDWR, 0o644)
     try:
-        os.write(fd, str(os.getpid()).encode("utf-8"))
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        try:
+            holder = int(os.read(fd, 32).decode("utf-8").strip())
+        except ValueError:
+            holder = None
         os.close(fd)
-        yield
+        if holder is not None:
+            raise SystemExit(f"Another git-sync instance is running (pid {holder}).")
+        raise SystemExit(f"Lockfile {lock_path} is held by another process; aborting.")
+
+    try:
+        write_lock_pid(fd)
+        yield fd
     finally:
-        with contextlib.suppress(OSError):
-            lock_path.unlink()
+        os.close(fd)
+
+
+def write_lock_pid(fd: int) -> None:
+    """Record this process's pid in the lockfile held open as `fd`."""
+    os.ftruncate(fd, 0)
+    os.pwrite(fd, str(os.getpid()).encode("utf-8"), 0)
+
+
+def resolve_path(value: Optional[str]) -> Optional[Path]:
+    return Path(value).expanduser().resolve() if value else None
 
 
 def write_pidfile(pidfile: Optional[Path]) -> None:
     if not pidfile:
         return
-    pidfile.parent.mkdir(parents=True, exist_ok=True)
+    ensure_dir(pidfile.parent)
     pidfile.write_text(str(os.getpid()), encoding="utf-8")
 
 
@@ -193,7 +568,7 @@ def daemonize(logfile: Optional[Path], pidfile: Optional[Path]) -> None:
     os.close(devnull)
 
     if logfile:
-        logfile.parent.mkdir(parents=True, exist_ok=True)
+        ensure_dir(logfile.parent)
         out = os.open(str(logfile), os.O_CREAT | os.O_APPEND | os.O_WRONLY, 0o644)
         os.dup2(out, 1)
         os.dup2(out, 2)
@@ -207,44 +582,73 @@ def daemonize(logfile: Optional[Path], pidfile: Optional[Path]) -> None:
     write_pidfile(pidfile)
 
 
-def repo_exists(path: Path) -> bool:
-    return (path / ".git").exists()
+def repo_exists(entry: Entry) -> bool:
+    # exists(), not isdir(): worktrees and submodules use a `.git` file.
+    return os.path.exists(entry._git_dir)
 
 
-def ensure_repo(path: Path, branch: str, remote: Optional[str]) -> None:
-    if repo_exists(path):
+def ensure_repo(entry: Entry) -> None:
+    if repo_exists(entry):
         return
 
+    path, branch, remote = entry.path, entry.branch, entry.remote
+
     log(f"Initializing repo at {path}")
     path.mkdir(parents=True, exist_ok=True)
-    try:
-        run_git(path, "init", "-b", branch)
-    except subprocess.CalledProcessError:
-        run_git(path, "init")
-        run_git(path, "checkout", "-B", branch, check=False)
 
+    # Let `git status` skip unchanged directories (and, with fsmonitor, the
+    # whole stat walk) on every later pass.
+    settings = [("core.untrackedCache", "true")]
+    if fsmonitor_supported():
+        settings.append(("core.fsmonitor", "true"))
+
+    # Everything in one shell spawn; `init -b` needs git 2.28+, hence the fallback.
+    git = f"{shlex.quote(GIT_BIN)} -C {shlex.quote(str(path))}"
+    cmds = [
+        f"{{ {git} init -b {shlex.quote(branch)} || "
+        f"{{ {git} init && {git} checkout -B {shlex.quote(branch)}; }}; }}",
+        *(f"{git} config {key} {value}" for key, value in settings),
+    ]
     if remote:
-        run_git(path, "remote", "add", "origin", remote, check=False)
+        cmds.append(f"{git} remote add origin {shlex.quote(remote)}")
+    if run_shell(" && ".join(cmds)).returncode == 0:
+        return
 
+    # Something in the chain failed; redo it step by step, tolerating
+    # everything but a failed `init`.
+    if run_git(path, "init", "-b", branch, capture=False).returncode != 0:
+        run_git(path, "init", capture=False).check_returncode()
+        run_git(path, "checkout", "-B", branch, capture=False)
+    for key, value in settings:
+        run_git(path, "config", key, value, capture=False)
+    if remote:
+        run_git(path, "remote", "add", "origin", remote, capture=False)
 
-def current_branch(path: Path) -> Optional[str]:
+
+@functools.lru_cache(maxsize=1)
+def fsmonitor_supported() -> bool:
+    """Whether this git build ships the builtin fsmonitor daemon (macOS/Windows)."""
     try:
-        res = run_git(path, "rev-parse", "--abbrev-ref", "HEAD")
-        return res.stdout.strip()
-    except subprocess.CalledProcessError:
-        return None
+        res = subprocess.run(
+            [GIT_BIN, "version", "--build-options"],
+            check=False,
+            text=True,
+            capture_output=True,
+            timeout=DEFAULT_GIT_TIMEOUT_SECONDS,
+            env=GIT_ENV,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return "fsmonitor--daemon" in res.stdout
 
 
 def set_branch(path: Path, branch: str) -> None:
-    run_git(path, "checkout", "-B", branch, check=False)
+    run_git(path, "checkout", "-B", branch, capture=False)
 
 
 def remote_exists(path: Path) -> bool:
-    try:
-        res = run_git(path, "remote")
-        return bool(res.stdout.strip())
-    except subprocess.CalledProcessError:
-        return False
+    # Exit status alone answers this; nothing is written to a pipe.
+    return git_status_code(path, "config", "--get", "remote.origin.url") == 0
 
 
 def upsert_remote(path: Path, remote: Optional[str]) -> None:
@@ -252,25 +656,79 @@ def upsert_remote(path: Path, remote: Optional[str]) -> None:
         return
     if remote_exists(path):
         return
-    run_git(path, "remote", "add", "origin", remote, check=False)
+    run_git(path, "remote", "add", "origin", remote, capture=False)
+
 
+@dataclass(**DATACLASS_SLOTS)
+class RepoState:
+    head: Optional[str]  # branch name, "(detached)", or None if unreadable
+    oid: Optional[str]  # commit at HEAD, "(initial)" on an unborn branch
+    dirty: bool
 
-def has_changes(path: Path) -> bool:
-    res = run_git(path, "status", "--porcelain", check=False)
-    return bool(res.stdout.strip())
 
+def repo_state(path: Path, untracked: bool = True) -> RepoState:
+    """Read branch, HEAD and dirtiness from one `status --porcelain=v2 --branch`.
+
+    The `# branch.*` headers come first, so only the first few KiB of output
+    are read; git is stopped once it starts listing changes. Rename
+    detection is skipped and untracked files are only scanned when
+    `untracked` is set.
+    """
+    args = ["status", "--porcelain=v2", "--branch", "--no-renames", "-z"]
+    if not untracked:
+        args.append("--untracked-files=no")
+    _, out = fast_git(path, *args, limit=STATUS_HEADER_LIMIT)
+    state = RepoState(head=None, oid=None, dirty=False)
+    for record in out.split("\0"):
+        if not record:
+            continue
+        if not record.startswith("# "):
+            state.dirty = True
+            break
+        key, _, value = record[2:].partition(" ")
+        if key == "branch.head":
+            state.head = value
+        elif key == "branch.oid":
+            state.oid = value
+    return state
+
+
+def branch_refs(
+    path: Path, branch: str, head_oid: Optional[str] = None
+) -> Dict[str, Optional[str]]:
+    """Resolve the local and origin tips of `branch` via the repo's GitSession.
+
+    `head_oid` is HEAD as `git status` saw it. If it names a commit but the
+    session can't find the local branch, the session is out of step with
+    the repo and is restarted before answering.
+    Returns {"local": oid, "origin": oid}; missing refs map to None.
+    """
+    session = git_session(path)
+
+    def resolve() -> Dict[str, Optional[str]]:
+        return {
+            "local": session.resolve(f"refs/heads/{branch}"),
+            "origin": session.resolve(f"refs/remotes/origin/{branch}"),
+        }
 
-def origin_branch_exists(path: Path, branch: str) -> bool:
-    res = run_git(path, "show-ref", "--verify", f"refs/remotes/origin/{branch}", check=False)
-    return res.returncode == 0
+    refs = resolve()
+    if refs["local"] is None and head_oid not in (None, "(initial)"):
+        session.close()
+        refs = resolve()
+    return refs
 
 
-def ahead_behind(path: Path, branch: str) -> Tuple[int, int]:
-    """Return (ahead, behind) relative to origin/branch.
+def ahead_behind(
+    path: Path, branch: str, refs: Dict[str, Optional[str]]
+) -> Tuple[int, int]:
+    """Return (ahead, behind) relative to origin/branch, given `branch_refs`.
 
-    If origin/branch doesn't exist, returns (0, 0).
+    If either branch doesn't exist, returns (0, 0). Identical tips, the
+    usual idle case, are answered from `refs` without running rev-list.
     """
-    if not origin_branch_exists(path, branch):
+    if refs["local"] is None or refs["origin"] is None:
+        return (0, 0)
+    if refs["local"] == refs["origin"]:
         return (0, 0)
     res = run_git(
         path,
@@ -278,7 +736,6 @@ def ahead_behind(path: Path, branch: str) -> Tuple[int, int]:
         "--left-right",
         "--count",
         f"origin/{branch}...{branch}",
-        check=False,
     )
     if res.returncode != 0:
         return (0, 0)
@@ -290,58 +747,219 @@ def ahead_behind(path: Path, branch: str) -> Tuple[int, int]:
     return (ahead, behind)
 
 
-def commit_changes(path: Path, message: str) -> bool:
-    if not has_changes(path):
+def commit_changes(path: Path, message: str, untracked: bool = True) -> bool:
+    """Stage and commit changes in a single shell invocation.
+
+    Without `untracked`, only tracked files are staged (`add -u`), which
+    skips the directory walk `add -A` does to find new files.
+    The staged-changes check is the `diff-index` plumbing, which only
+    compares the index to HEAD's tree; `diff --cached` is only needed on
+    an unborn branch, where there is no HEAD to compare against.
+    Returns True if a commit was created.
+    """
+    git = f"{shlex.quote(GIT_BIN)} -C {shlex.quote(str(path))}"
+    stage = "add -A" if untracked else "add -u"
+    script = (
+        f"{git} {stage} && "
+        f"{{ {git} diff-index --quiet --cached HEAD -- 2>/dev/null; "
+        f"case $? in 0) exit {NOTHING_TO_COMMIT_EXIT};; 1) ;; "
+        f"*) {git} diff --cached --quiet && exit {NOTHING_TO_COMMIT_EXIT};; esac; "
+        f"{git} commit -m {shlex.quote(message)}; }}"
+    )
+    res = run_shell(script)
+    if res.returncode == NOTHING_TO_COMMIT_EXIT:
+        return False
+    if res.returncode != 0:
+        log(f"Commit failed for {path}: {res.stderr or res.stdout}")
         return False
-    run_git(path, "add", "-A")
-    run_git(path, "commit", "-m", message, check=False)
     return True
 
 
-def push_changes(path: Path, branch: str) -> None:
-    if not remote_exists(path):
-        log(f"No remote configured for {path}; skipping push")
-        return
-    try:
-        run_git(path, "push", "-u", "origin", branch, check=False)
-    except subprocess.CalledProcessError as exc:
-        log(f"Push failed for {path}: {exc.stderr or exc}")
-
-
-def fetch_remote(path: Path, branch: str) -> bool:
-    res = run_git(path, "fetch", "--prune", "origin", branch, check=False)
+def push_changes(path: Path, branch: str) -> bool:
+    res = run_git(path, "push", "-u", "origin", branch, capture=False)
     if res.returncode != 0:
-        log(f"Fetch failed for {path}: {res.stderr or res.stdout}")
+        log(f"Push failed for {path}: {res.stderr}")
         return False
     return True
 
 
-def rebase_onto_remote(path: Path, branch: str) -> bool:
-    res = run_git(path, "rebase", f"origin/{branch}", check=False)
-    if res.returncode != 0:
-        # Attempt to clean up to avoid leaving repo in rebase state
-        run_git(path, "rebase", "--abort", check=False)
-        log(f"Rebase failed for {path}: {res.stderr or res.stdout}")
+def pull_rebase(path: Path, branch: str, target: Tuple[str, int]) -> bool:
+    """Fetch origin/branch and rebase onto it in one git process.
+
+    The pull doubles as the connectivity check: network failures mark
+    `target` offline so other entries sharing the host skip it until
+    REACHABILITY_TTL_SECONDS have passed. Returns False if we shouldn't push.
+    """
+    host, port = target
+    try:
+        res = run_git(
+            path,
+            "pull",
+            "--rebase",
+            "--autostash",
+            "--prune",
+            "--no-tags",
+            "origin",
+            branch,
+        )
+    except subprocess.TimeoutExpired:
+        # Only the `pull` parent is killed; its rebase may have stopped
+        # partway through. A timeout can also be one slow repo, so the
+        # host stays marked as reachable for the other entries.
+        run_git(path, "rebase", "--abort", capture=False)
+        log(f"Pull timed out for {path}; will retry next run")
         return False
-    return True
+    if res.returncode == 0:
+        return True
+    if any(marker in res.stderr for marker in NETWORK_ERROR_MARKERS):
+        mark_offline(target)
+        log(f"Offline; will push on next run ({host}:{port})")
+        return False
+    if "couldn't find remote ref" in res.stderr:
+        # Branch doesn't exist on the remote yet; pushing creates it.
+        return True
+    # Attempt to clean up to avoid leaving repo in rebase state
+    run_git(path, "rebase", "--abort", capture=False)
+    log(f"Pull failed for {path}: {res.stderr or res.stdout}")
+    return False
+
+
+# str(entry path) -> {"head": oid, "checked": epoch seconds} for the last
+# pass that left local and origin at the same commit.
+_sync_state: Dict[str, Dict[str, Any]] = {}
+_sync_state_lock = threading.Lock()
+# Bytes of STATE_PATH as last read or written; passes that change nothing
+# (all entries cached idle) skip the rewrite.
+_sync_state_raw = b""
+
+
+def load_sync_state() -> None:
+    global _sync_state, _sync_state_raw
+    try:
+        raw = STATE_PATH.read_bytes()
+        data = json_loads(raw)
+    except (OSError, ValueError):
+        raw, data = b"", {}
+    with _sync_state_lock:
+        _sync_state = data if isinstance(data, dict) else {}
+        _sync_state_raw = raw
+
+
+def save_sync_state() -> None:
+    global _sync_state_raw
+    with _sync_state_lock:
+        raw = json_dumps(_sync_state)
+        if raw == _sync_state_raw:
+            return
+        _sync_state_raw = raw
+    ensure_dir(STATE_PATH.parent)
+    tmp = STATE_PATH.with_suffix(".json.tmp")
+    tmp.write_bytes(raw)
+    os.replace(tmp, STATE_PATH)
+
+
+def remote_recently_matched(path: Path, oid: Optional[str], window_minutes: int) -> bool:
+    """True if `oid` is what local and origin agreed on less than `window_minutes` ago."""
+    if not oid or window_minutes <= 0:
+        return False
+    with _sync_state_lock:
+        record = _sync_state.get(str(path))
+    if record is None or record.get("head") != oid:
+        return False
+    # A record from the future means the clock stepped back; don't trust it.
+    age = time.time() - record.get("checked", 0)
+    return 0 <= age < window_minutes * 60
+
+
+def record_in_sync(path: Path, oid: Optional[str]) -> None:
+    with _sync_state_lock:
+        if oid:
+            _sync_state[str(path)] = {"head": oid, "checked": time.time()}
+        else:
+            _sync_state.pop(str(path), None)
+
+
+# (host, port) -> (monotonic time of the answer, reachable)
+_reachability_cache: Dict[Tuple[str, int], Tuple[float, bool]] = {}
+_reachability_lock = threading.Lock()
 
 
-def online(host: str) -> bool:
-    return online_host_port(host, DEFAULT_NETWORK_PORT)
+def mark_offline(target: Tuple[str, int]) -> None:
+    with _reachability_lock:
+        _reachability_cache[target] = (time.monotonic(), False)
 
 
 def online_host_port(host: str, port: int) -> bool:
+    """Return whether host:port accepts TCP connections.
+
+    Answers are cached for REACHABILITY_TTL_SECONDS, so entries sharing a
+    host cost a single probe per pass. A miss runs the same asyncio probe
+    as probe_targets, on a loop private to the calling worker thread.
+    """
+    target = (host, port)
+    with _reachability_lock:
+        cached = _reachability_cache.get(target)
+    if cached is not None and time.monotonic() - cached[0] < REACHABILITY_TTL_SECONDS:
+        return cached[1]
+    reachable = asyncio.run(_probe_async(host, port))
+    with _reachability_lock:
+        _reachability_cache[target] = (time.monotonic(), reachable)
+    return reachable
+
+
+def probe_targets(targets: List[Tuple[str, int]]) -> None:
+    """Warm the reachability cache for all `targets` concurrently.
+
+    All connects share one event loop instead of a thread per host.
+    """
+    now = time.monotonic()
+    with _reachability_lock:
+        stale = [
+            target
+            for target in targets
+            if target not in _reachability_cache
+            or now - _reachability_cache[target][0] >= REACHABILITY_TTL_SECONDS
+        ]
+    if not stale:
+        return
+    results = asyncio.run(_probe_all(stale))
+    now = time.monotonic()
+    with _reachability_lock:
+        for target, reachable in zip(stale, results):
+            _reachability_cache[target] = (now, reachable)
+
+
+async def _probe_all(targets: List[Tuple[str, int]]) -> List[bool]:
+    return list(await asyncio.gather(*(_probe_async(host, port) for host, port in targets)))
+
+
+async def _probe_async(host: str, port: int) -> bool:
+    # Any failure means unreachable: a malformed remote (port out of range,
+    # overlong hostname label) must not abort the whole pass.
     try:
-        with socket.create_connection((host, port), timeout=2):
-            return True
-    except OSError:
+        _, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port), PROBE_TIMEOUT_SECONDS
+        )
+    except Exception:
         return False
+    writer.close()
+    with contextlib.suppress(OSError):
+        await writer.wait_closed()
+    return True
 
 
 def infer_ssh_target(remote: Optional[str], cfg: Config) -> Tuple[str, int]:
     """Best-effort: infer SSH host/port from remote, else fall back to config."""
+    return _parse_ssh_target(remote, cfg.network_host, cfg.network_port)
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_ssh_target(
+    remote: Optional[str], fallback_host: str, fallback_port: int
+) -> Tuple[str, int]:
+    # Remotes rarely change, so a daemon parses each one only once.
     if not remote:
-        return (cfg.network_host, cfg.network_port)
+        return (fallback_host, fallback_port)
 
     # scp-like: git@github.com:owner/repo.git
     if ":" in remote and "@" in remote and not remote.startswith("ssh://"):
@@ -350,7 +968,7 @@ def infer_ssh_target(remote: Optional[str], cfg: Config) -> Tuple[str, int]:
             host = host_part.split(":", 1)[0]
             return (host, DEFAULT_NETWORK_PORT)
         except Exception:
-            return (cfg.network_host, cfg.network_port)
+            return (fallback_host, fallback_port)
 
     # ssh://user@host:port/path
     if remote.startswith("ssh://"):
@@ -364,7 +982,7 @@ def infer_ssh_target(remote: Optional[str], cfg: Config) -> Tuple[str, int]:
                 return (host, int(port_s))
         return (hostport, DEFAULT_NETWORK_PORT)
 
-    return (cfg.network_host, cfg.network_port)
+    return (fallback_host, fallback_port)
 
 
 # --------------------------- actions ---------------------------
@@ -378,13 +996,15 @@ def add_entry(args: argparse.Namespace) -> None:
         branch=args.branch,
         push=not args.no_push,
         commit_message=args.commit_message,
+        untracked=not args.ignore_untracked,
     )
 
-    if any(e.path == new_entry.path for e in cfg.entries):
+    key = str(new_entry.path)
+    if key in cfg.entries:
         log(f"Path already tracked: {new_entry.path}")
         return
 
-    cfg.entries.append(new_entry)
+    cfg.entries[key] = new_entry
     cfg.save()
     log(f"Added {new_entry.path}")
 
@@ -392,10 +1012,8 @@ def add_entry(args: argparse.Namespace) -> None:
 def remove_entry(args: argparse.Namespace) -> None:
     cfg = Config.load()
     target = Path(args.path).expanduser().resolve()
-    before = len(cfg.entries)
-    cfg.entries = [e for e in cfg.entries if e.path != target]
-    cfg.save()
-    if len(cfg.entries) < before:
+    if cfg.entries.pop(str(target), None) is not None:
+        cfg.save()
         log(f"Removed {target}")
     else:
         log(f"Path not found: {target}")
@@ -406,32 +1024,37 @@ def list_entries(_: argparse.Namespace) -> None:
     if not cfg.entries:
         log("No tracked paths yet. Use add <path> to start.")
         return
-    for e in cfg.entries:
+    for e in cfg.entries.values():
         flags = []
         if e.remote:
             flags.append(f"remote={e.remote}")
         flags.append(f"branch={e.branch}")
         flags.append("push" if e.push else "no-push")
+        if not e.untracked:
+            flags.append("ignore-untracked")
         log(f"- {e.path} ({', '.join(flags)})")
 
 
-def sync_entry(entry: Entry, cfg: Config, push_override: Optional[bool]) -> None:
+def sync_entry(
+    entry: Entry, cfg: Config, push_override: Optional[bool], timestamp: str
+) -> None:
     path = entry.path
     push = entry.push if push_override is None else push_override
-    ensure_repo(path, entry.branch, entry.remote)
+    ensure_repo(entry)
     upsert_remote(path, entry.remote)
 
-    branch = current_branch(path) or entry.branch
+    # One status call per pass answers the branch check and dirtiness.
+    state = repo_state(path, untracked=entry.untracked)
+    branch = state.head or entry.branch
     if branch != entry.branch:
         set_branch(path, entry.branch)
         branch = entry.branch
+    dirty = state.dirty
 
     if not push:
-        if has_changes(path):
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        if dirty:
             message = f"{entry.commit_message} ({timestamp})"
-            did_commit = commit_changes(path, message)
-            if did_commit:
+            if commit_changes(path, message, untracked=entry.untracked):
                 log(f"Committed changes in {path}")
         else:
             log(f"Idle: {path}")
@@ -439,58 +1062,85 @@ def sync_entry(entry: Entry, cfg: Config, push_override: Optional[bool]) -> None
 
     if not remote_exists(path):
         # Still commit locally even if push enabled but remote missing
-        if has_changes(path):
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        if dirty:
             message = f"{entry.commit_message} ({timestamp})"
-            did_commit = commit_changes(path, message)
-            if did_commit:
+            if commit_changes(path, message, untracked=entry.untracked):
                 log(f"Committed changes in {path}")
         log(f"No remote configured for {path}; skipping push")
         return
 
-    host, port = infer_ssh_target(entry.remote, cfg)
-    if not online_host_port(host, port):
-        log(f"Offline; will push on next run ({host}:{port})")
-        return
-
-    if not fetch_remote(path, branch):
+    # Nothing new locally and the remote matched this commit recently:
+    # skip the network until the recheck window runs out.
+    if not dirty and remote_recently_matched(path, state.oid, cfg.remote_recheck_minutes):
+        log(f"Cached idle: {path}")
         return
 
-    # If we have local file changes, commit them first.
-    if has_changes(path):
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    # Commit local file changes first so the pull below can rebase them.
+    if dirty:
         message = f"{entry.commit_message} ({timestamp})"
-        did_commit = commit_changes(path, message)
-        if did_commit:
+        if commit_changes(path, message, untracked=entry.untracked):
             log(f"Committed changes in {path}")
 
-    # Rebase if we're behind (or diverged) and then push if we're ahead.
-    ahead, behind = ahead_behind(path, branch)
-    if behind > 0:
-        if not rebase_onto_remote(path, branch):
-            return
-        ahead, behind = ahead_behind(path, branch)
+    target = infer_ssh_target(entry.remote, cfg)
+    if not online_host_port(*target):
+        log(f"Offline; will push on next run ({target[0]}:{target[1]})")
+        return
+
+    if not pull_rebase(path, branch, target):
+        return
 
-    if ahead > 0 or not origin_branch_exists(path, branch):
-        push_changes(path, branch)
+    # Push if we're ahead (or the branch doesn't exist on the remote yet).
+    refs = branch_refs(path, branch, state.oid)
+    ahead, _ = ahead_behind(path, branch, refs)
+    if ahead > 0 or (refs["origin"] is None and refs["local"] is not None):
+        if push_changes(path, branch):
+            record_in_sync(path, refs["local"])
     else:
+        record_in_sync(path, refs["local"] if refs["local"] == refs["origin"] else None)
         log(f"Up to date: {path}")
 
 
-def sync_all(args: argparse.Namespace) -> None:
-    cfg = Config.load()
+def sync_all(args: argparse.Namespace, cfg: Optional[Config] = None) -> None:
+    if cfg is None:
+        cfg = load_config_cached()
+    # Don't keep cat-file processes alive for entries that were removed.
+    prune_sessions([e.path for e in cfg.entries.values()])
     if not cfg.entries:
         log("No tracked paths; add one first.")
         return
-    for entry in cfg.entries:
-        try:
-            sync_entry(entry, cfg, push_override=args.no_push_all)
-        except Exception as exc:  # noqa: BLE001
-            log(f"Error syncing {entry.path}: {exc}")
+    push_override = False if args.no_push_all else None
+    # One commit timestamp for the whole pass.
+    timestamp = time.strftime(TIMESTAMP_FORMAT, time.localtime())
+
+    # Probe every distinct SSH endpoint up front, in parallel, instead of
+    # letting the first entry for each host pay for it serially.
+    if push_override is None:
+        targets = {infer_ssh_target(e.remote, cfg) for e in cfg.entries.values() if e.push}
+        probe_targets(sorted(targets))
+
+    load_sync_state()
+
+    # Entries are independent repos and syncing them is mostly waiting on
+    # git and the network (the GIL is released), so a thread pool suffices.
+    jobs = max(1, min(args.jobs, len(cfg.entries)))
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = [
+            (entry, pool.submit(sync_entry, entry, cfg, push_override, timestamp))
+            for entry in cfg.entries.values()
+        ]
+        for entry, future in futures:
+            exc = future.exception()
+            if exc is not None:
+                log(f"Error syncing {entry.path}: {exc}")
+
+    try:
+        save_sync_state()
+    except OSError as exc:
+        log(f"Could not save sync state: {exc}")
 
 
 def run_loop(args: argparse.Namespace) -> None:
-    cfg = Config.load()
+    cfg = load_config_cached()
     interval = args.interval or cfg.interval_minutes
     if interval < MIN_INTERVAL_MINUTES:
         log(f"Interval too low ({interval}); using {MIN_INTERVAL_MINUTES} minute")
@@ -504,35 +1154,40 @@ def run_loop(args: argparse.Namespace) -> None:
     signal.signal(signal.SIGTERM, _handle_signal)
     signal.signal(signal.SIGINT, _handle_signal)
 
-    lock_path = Path(args.lockfile).expanduser().resolve() if args.lockfile else DEFAULT_LOCK_PATH
-    with pid_lock(lock_path):
+    # Resolved once; each resolve() stats every path component.
+    lock_path = resolve_path(args.lockfile) or DEFAULT_LOCK_PATH
+    pidfile = resolve_path(args.pidfile)
+    with pid_lock(lock_path) as lock_fd:
         if args.daemon:
-            daemonize(
-                Path(args.logfile).expanduser().resolve() if args.logfile else None,
-                Path(args.pidfile).expanduser().resolve() if args.pidfile else None,
-            )
+            daemonize(resolve_path(args.logfile), pidfile)
+            # The lock survives the forks, but the pid recorded in it is
+            # the parent's, which has exited.
+            write_lock_pid(lock_fd)
             log("Started in daemon mode")
 
         else:
-            write_pidfile(Path(args.pidfile).expanduser().resolve() if args.pidfile else None)
+            write_pidfile(pidfile)
 
         try:
             while True:
-                sync_all(args)
+                # Only re-parsed when the file's mtime/size changed.
+                cfg = load_config_cached()
+                sync_all(args, cfg)
                 if args.once or stop_flag["stop"]:
                     return
                 time.sleep(interval * 60)
         finally:
-            remove_pidfile(Path(args.pidfile).expanduser().resolve() if args.pidfile else None)
+            close_sessions()
+            remove_pidfile(pidfile)
 
 
 def stop_daemon(args: argparse.Namespace) -> None:
     pidfile = Path(args.pidfile).expanduser().resolve()
-    if not pidfile.exists():
-        log(f"PID file not found: {pidfile}")
-        return
     try:
         pid = int(pidfile.read_text(encoding="utf-8").strip())
+    except FileNotFoundError:
+        log(f"PID file not found: {pidfile}")
+        return
     except Exception:
         log(f"Invalid PID file: {pidfile}")
         return
@@ -558,6 +1213,11 @@ def build_parser() -> argparse.ArgumentParser:
     add_cmd.add_argument("--branch", default="main", help="Branch name (default: main)")
     add_cmd.add_argument("--commit-message", default="Auto-sync", help="Base commit message")
     add_cmd.add_argument("--no-push", action="store_true", help="Do not push for this entry")
+    add_cmd.add_argument(
+        "--ignore-untracked",
+        action="store_true",
+        help="Skip untracked files when checking for changes",
+    )
     add_cmd.set_defaults(func=add_entry)
 
     rm_cmd = sub.add_parser("remove", help="Stop tracking a directory")
@@ -569,6 +1229,12 @@ def build_parser() -> argparse.ArgumentParser:
 
     sync_cmd = sub.add_parser("sync", help="Run one sync pass")
     sync_cmd.add_argument("--no-push-all", action="store_true", help="Disable pushes for this run")
+    sync_cmd.add_argument(
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help=f"Entries to sync in parallel (default: {DEFAULT_JOBS})",
+    )
     sync_cmd.add_argument(
         "--lockfile",
         help=f"Lock file path (default: {DEFAULT_LOCK_PATH})",
@@ -580,6 +1246,12 @@ def build_parser() -> argparse.ArgumentParser:
         "--interval", type=int, help="Minutes between checks (default: config value)"
     )
     run_cmd.add_argument("--no-push-all", action="store_true", help="Disable pushes for this run")
+    run_cmd.add_argument(
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help=f"Entries to sync in parallel (default: {DEFAULT_JOBS})",
+    )
     run_cmd.add_argument("--once", action="store_true", help="Run a single pass then exit")
     run_cmd.add_argument(
         "--daemon",
@@ -604,12 +1276,16 @@ def build_parser() -> argparse.ArgumentParser:
 def main(argv: List[str]) -> int:
     parser = build_parser()
     args = parser.parse_args(argv)
+    # Config, state and default lock all live here; create it once up front.
+    ensure_dir(CONFIG_PATH.parent)
 
     # keep sync path locked too (single pass)
     if args.command == "sync":
-        lock_path = Path(args.lockfile).expanduser().resolve() if args.lockfile else DEFAULT_LOCK_PATH
-        with pid_lock(lock_path):
-            args.func(args)
+        with pid_lock(resolve_path(args.lockfile) or DEFAULT_LOCK_PATH):
+            try:
+                args.func(args)
+            finally:
+                close_sessions()
         return 0
 
     args.func(args)